@@ -2,9 +2,8 @@ import streamlit as st
 import os
 import io
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import backend
-import re
-import headers_map as hm
 from dotenv import load_dotenv
 from conference_options import CONFERENCE_OPTIONS
 
@@ -93,102 +92,52 @@ if uploaded_files and not st.session_state.processing:
 if st.session_state.processing and uploaded_files:
     progress_bar = st.progress(0)
     status_text = st.empty()
-    temp_results = []
-
-    for i, uploaded_file in enumerate(uploaded_files):
-        status_text.text(f"Processing file {i + 1}/{len(uploaded_files)}: {uploaded_file.name}...")
-        try:
-            with st.status(f"📄 Processing: {uploaded_file.name}", expanded=show_details) as status:
-                # --- Step 1: Extraction & Filtering ---
-                uploaded_file.seek(0)
+    results_by_index = {}
+    completed = 0
+
+    # PyMuPDF extraction and FPDF rendering stay on this thread; only the LLM review of each paper runs in the pool
+    with ThreadPoolExecutor(max_workers=backend.MAX_PAPER_WORKERS) as executor:
+        futures = {}
+        for i, uploaded_file in enumerate(uploaded_files):
+            status_text.text(f"Extracting file {i + 1}/{len(uploaded_files)}: {uploaded_file.name}...")
+            try:
                 sections = backend.extract_sections(uploaded_file)
-                full_text_clean = backend.combine_section_content(sections)
-
-                # Filter out Front/Back matter for detailed review
-                reviewable_sections = []
-                for s in sections:
-                    clean_title = re.sub(r"^[\d\w]+\.\s*", "", s['title'].upper().strip())
-                    mapped = hm.HEADER_MAP.get(clean_title, clean_title)
-                    if mapped not in hm.FRONT_MATTER and mapped not in hm.BACK_MATTER:
-                        reviewable_sections.append(s)
-
-                # --- Step 2: UI Setup (Tabs) ---
-                if show_details:
-                    tab_names = ["🔍 First Pass"] + [s['title'] for s in reviewable_sections]
-                    tabs = st.tabs(tab_names)
-                    first_pass_tab, section_tabs = tabs[0], tabs[1:]
-                else:
-                    first_pass_tab, section_tabs = st.empty(), []
-
-                # --- Step 3: First Pass ---
-                with first_pass_tab:
-                    st.info(f"Analyzing Abstract (Mode: {audience.title()})...")
-                    first_pass_content = backend.evaluate_first_pass(
-                        client, uploaded_file.name, full_text_clean[:4000], target_conference, audience
-                    )
-                    st.markdown(first_pass_content)
-
-                # --- Step 4: Decision & Detailed Review ---
-                generated_slug = uploaded_file.name.replace(".pdf", "")[:20].replace(" ", "_")
-                report_log = f"CONFERENCE TRACK: {target_conference}\n\n--- FIRST PASS ---\n{first_pass_content}\n\n"
-                saved_tabs_data = []
-                flagged_items = []
-
-                if "REJECT" in first_pass_content.upper():
-                    decision = "REJECT"
-                    notes = first_pass_content.split("REASON:")[
-                        1].strip() if "REASON:" in first_pass_content else "Rejected"
-                    if show_details: st.error("❌ Rejected at First Pass.")
-                else:
-                    # Detailed Review (Pods logic)
-                    report_log += "--- SECTION ANALYSIS ---\n"
-                    # Split into Pods using the mapping
-                    pod1 = [s for s in reviewable_sections if
-                            hm.HEADER_MAP.get(re.sub(r"^[\d\w]+\.\s*", "", s['title'].upper().strip()), "") in hm.POD_1]
-                    pod2 = [s for s in reviewable_sections if s not in pod1]
-
-                    for pod in [p for p in [pod1, pod2] if p]:
-                        pod_titles = ", ".join([s['title'] for s in pod])
-                        st.write(f"Reviewing: {pod_titles}...")
-                        batch_feedbacks = backend.generate_batch_review(client, pod, uploaded_file.name,
-                                                                        target_conference, audience)
-
-                        for sec in pod:
-                            feedback = batch_feedbacks.get(sec['title'], "Review failed.")
-                            report_log += f"\n--- SECTION: {sec['title']} ---\n{feedback}\n"
-                            saved_tabs_data.append({"title": sec['title'], "content": feedback})
-
-                            if show_details:
-                                # Safe index lookup
-                                try:
-                                    tab_idx = reviewable_sections.index(sec)
-                                    with section_tabs[tab_idx]:
-                                        st.markdown(feedback)
-                                except (ValueError, IndexError):
-                                    pass
-
-                            if any(k in feedback for k in
-                                   ["ACCEPT WITH SUGGESTIONS", "REJECT", "REVISIONS RECOMMENDED"]):
-                                flagged_items.append(sec['title'])
-
-                    decision = "Accept w/ Suggestions" if flagged_items else "Accept"
-                    notes = f"Issues in: {', '.join(flagged_items)}" if flagged_items else "Standard Review."
-
-                # --- Step 5: Report Generation ---
-                pdf_bytes = backend.create_pdf(report_log, filename=generated_slug, audience=audience)
-                temp_results.append({
-                    'filename': generated_slug, 'decision': decision, 'notes': notes,
-                    'report_text': report_log, 'pdf_bytes': pdf_bytes,
-                    'first_pass_content': first_pass_content, 'saved_tabs_data': saved_tabs_data,
-                    'audience': audience
-                })
-                status.update(label=f"✅ Finished: {uploaded_file.name}", state="complete")
-
-        except Exception as e:
-            st.error(f"Error processing {uploaded_file.name}: {e}")
-        progress_bar.progress((i + 1) / len(uploaded_files))
-
-    st.session_state.results = temp_results
+                futures[executor.submit(backend.review_paper, client, uploaded_file.name, sections,
+                                        target_conference, audience)] = i
+            except Exception as e:
+                st.error(f"Error processing {uploaded_file.name}: {e}")
+                completed += 1
+                progress_bar.progress(completed / len(uploaded_files))
+
+        status_text.text(f"Reviewing {len(futures)} file(s) (Mode: {audience.title()})...")
+        for future in as_completed(futures):
+            i = futures[future]
+            uploaded_file = uploaded_files[i]
+            try:
+                with st.status(f"📄 Processing: {uploaded_file.name}", expanded=show_details) as status:
+                    result = future.result()
+                    result['pdf_bytes'] = backend.create_pdf(result['report_text'], filename=result['filename'],
+                                                             audience=audience)
+
+                    if show_details:
+                        tabs = st.tabs(["🔍 First Pass"] + [s['title'] for s in result['saved_tabs_data']])
+                        with tabs[0]:
+                            st.markdown(result['first_pass_content'])
+                            if result['decision'] == "REJECT": st.error("❌ Rejected at First Pass.")
+                        for tab, sec_data in zip(tabs[1:], result['saved_tabs_data']):
+                            with tab:
+                                st.markdown(sec_data['content'])
+
+                    results_by_index[i] = result
+                    status.update(label=f"✅ Finished: {uploaded_file.name}", state="complete")
+
+            except Exception as e:
+                st.error(f"Error processing {uploaded_file.name}: {e}")
+            completed += 1
+            progress_bar.progress(completed / len(uploaded_files))
+
+    # Keep upload order regardless of which review finished first
+    st.session_state.results = [results_by_index[i] for i in sorted(results_by_index)]
     st.session_state.processing = False
     st.rerun()
 
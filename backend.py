@@ -1,16 +1,72 @@
+import os
+import configurator
 import document_reader
 import getai
+import headers_map as hm
 import report_generator
 
 # This allows UI.py to call backend.extract_sections() etc.
 extract_sections = document_reader.extract_sections_visual
 evaluate_first_pass = getai.evaluate_first_pass
 generate_batch_review = getai.generate_batch_review
+review_pods = getai.review_pods
 create_pdf = report_generator.create_pdf_report
 create_zip = report_generator.create_zip_of_reports
+clean_section_title = configurator.clean_section_title
+
+# Papers reviewed at once; their LLM calls still share getai's global concurrency limit
+MAX_PAPER_WORKERS = int(os.getenv("MAX_PAPER_WORKERS", "4"))
+
+FLAG_KEYWORDS = ["ACCEPT WITH SUGGESTIONS", "REJECT", "REVISIONS RECOMMENDED"]
 
 def combine_section_content(sections):
     return "\n".join([f"--- {s['title']} ---\n{s['content']}" for s in sections])
 
 def get_openai_client(api_key):
-    return getai.get_openai_client(api_key)
\ No newline at end of file
+    return getai.get_openai_client(api_key)
+
+def get_reviewable_sections(sections):
+    # Filter out Front/Back matter for detailed review
+    reviewable_sections = []
+    for s in sections:
+        clean_title = clean_section_title(s['title'])
+        if hm.HEADER_MAP.get(clean_title, clean_title) not in hm.SKIP_REVIEW_SECTIONS:
+            reviewable_sections.append(s)
+    return reviewable_sections
+
+def review_paper(client, paper_name, sections, conference_name, audience):
+    # LLM part of the pipeline only (no PyMuPDF/FPDF work), so papers can run on worker threads
+    full_text_clean = combine_section_content(sections)
+    first_pass_content = evaluate_first_pass(client, paper_name, full_text_clean[:4000], conference_name, audience)
+
+    report_log = f"CONFERENCE TRACK: {conference_name}\n\n--- FIRST PASS ---\n{first_pass_content}\n\n"
+    saved_tabs_data = []
+    flagged_items = []
+
+    if "REJECT" in first_pass_content.upper():
+        decision = "REJECT"
+        notes = first_pass_content.split("REASON:")[1].strip() if "REASON:" in first_pass_content else "Rejected"
+    else:
+        # Detailed Review: split into Pods using the mapping
+        report_log += "--- SECTION ANALYSIS ---\n"
+        # Skipped sections never reach prompt building; the rest are split into pods in one pass
+        pod1, pod2 = [], []
+        for s in get_reviewable_sections(sections):
+            (pod1 if hm.HEADER_MAP.get(clean_section_title(s['title']), "") in hm.POD_1 else pod2).append(s)
+        pods = [p for p in [pod1, pod2] if p]
+
+        for pod, batch_feedbacks in zip(pods, review_pods(client, pods, paper_name, conference_name, audience)):
+            for sec in pod:
+                feedback = batch_feedbacks.get(sec['title'], "Review failed.")
+                report_log += f"\n--- SECTION: {sec['title']} ---\n{feedback}\n"
+                saved_tabs_data.append({"title": sec['title'], "content": feedback})
+                if any(k in feedback for k in FLAG_KEYWORDS): flagged_items.append(sec['title'])
+
+        decision = "Accept w/ Suggestions" if flagged_items else "Accept"
+        notes = f"Issues in: {', '.join(flagged_items)}" if flagged_items else "Standard Review."
+
+    return {
+        'filename': paper_name.replace(".pdf", "")[:20].replace(" ", "_"), 'decision': decision, 'notes': notes,
+        'report_text': report_log, 'first_pass_content': first_pass_content, 'saved_tabs_data': saved_tabs_data,
+        'audience': audience
+    }
@@ -1,33 +1,83 @@
+import os
 import re
+import threading
+import time
+from functools import lru_cache
 
-IGNORE_CAPTION_KEYWORDS = [
+IGNORE_CAPTION_KEYWORDS = (
     "FIGURE", "FIG", "FIG.", "TABLE", "TAB", "TAB.",
     "IMAGE", "IMG", "IMG.", "CHART", "GRAPH", "DIAGRAM", "EQ", "EQUATION"
-]
+)
 
+SECTION_NUMBER_RE = re.compile(r"^[\d\w]+\.\s*")
+
+# Typographic punctuation -> ASCII, applied in one pass
+PDF_SANITIZE_TABLE = str.maketrans({
+    u'\u2018': "'", u'\u2019': "'", u'\u201c': '"', u'\u201d': '"',
+    u'\u2013': '-', u'\u2014': '-', u'\u2212': '-'
+})
+
+# On-disk caches (LLM replies, extracted sections) hold text from uploaded papers. Entries older than
+# CACHE_MAX_AGE_DAYS are deleted, then the oldest ones until a directory fits in CACHE_MAX_MB.
+# Delete the cache directories to clear them by hand.
+CACHE_MAX_AGE_DAYS = float(os.getenv("CACHE_MAX_AGE_DAYS", "30"))
+CACHE_MAX_MB = float(os.getenv("CACHE_MAX_MB", "500"))
+CACHE_PRUNE_INTERVAL = 600  # Seconds between scans of the same directory
+_last_prune = {}
+_prune_lock = threading.Lock()
+
+ROMAN_MAP = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100, 'D': 500, 'M': 1000}
+
+@lru_cache(maxsize=256)
 def roman_to_int(s):
-    roman_map = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100, 'D': 500, 'M': 1000}
     s = s.upper()
     total = 0
     prev_value = 0
-    try:
-        for char in reversed(s):
-            if char not in roman_map: return None
-            value = roman_map[char]
-            if value < prev_value:
-                total -= value
-            else:
-                total += value
-            prev_value = value
-        return total
-    except:
-        return None
+    for char in reversed(s):
+        value = ROMAN_MAP.get(char)
+        if value is None: return None
+        if value < prev_value:
+            total -= value
+        else:
+            total += value
+        prev_value = value
+    return total
+
+def clean_section_title(title):
+    return SECTION_NUMBER_RE.sub("", title.upper().strip())
 
 def sanitize_text_for_pdf(text):
-    replacements = {
-        u'\u2018': "'", u'\u2019': "'", u'\u201c': '"', u'\u201d': '"',
-        u'\u2013': '-', u'\u2014': '-', u'\u2212': '-', "**": ""
-    }
-    for char, replacement in replacements.items():
-        text = text.replace(char, replacement)
-    return text
\ No newline at end of file
+    return text.translate(PDF_SANITIZE_TABLE).replace("**", "")
+
+def write_cache_file(path, text):
+    # Write to a private temp file and rename over the target, so a concurrent reader never sees a partial entry
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f: f.write(text)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def prune_cache_dir(directory):
+    now = time.time()
+    with _prune_lock:
+        if now - _last_prune.get(directory, 0) < CACHE_PRUNE_INTERVAL: return
+        _last_prune[directory] = now
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in it if e.is_file()), reverse=True)
+    except FileNotFoundError:
+        return
+    cutoff, budget, total = now - CACHE_MAX_AGE_DAYS * 86400, CACHE_MAX_MB * 1024 * 1024, 0
+    for mtime, size, path in entries:  # Newest first, so the oldest entries go once the budget is spent
+        total += size
+        if mtime < cutoff or total > budget:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
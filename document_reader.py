@@ -1,65 +1,138 @@
 import fitz  # PyMuPDF
+import hashlib
+import io
+import json
+import os
 import re
+from functools import lru_cache
 import headers_map as hm
-from configurator import roman_to_int, IGNORE_CAPTION_KEYWORDS
-
-
+from configurator import prune_cache_dir, roman_to_int, write_cache_file, IGNORE_CAPTION_KEYWORDS
+
+_MAPPED_FIRST_CHARS = frozenset(k[0] for k in hm.HEADER_MAP)
+_MAX_MAPPED_LEN = max(map(len, hm.HEADER_MAP))  # Colons are dropped before the lookup, so they do not count
+_MAX_HEADER_LINE = 120
+_ROMAN_CHARS = frozenset("IVXLCDMivxlcdm")
+_HEADER_RE = re.compile(r"^([IVXLCDMivxlcdm]+|\d+)(\.?)\s+([A-Z].*)$")
+_NUM_ONLY_RE = re.compile(r"^([IVXLCDMivxlcdm]+|\d+)(\.?)$")
+_LINE_NUMBER_RE = re.compile(r"^\d+\s+(.*)$")
+_CAPTION_RE = re.compile(r"^(?:FIG(?:URE)?|TAB(?:LE)?)\.?\s*(?:\d+|[IVXLC]+)\s*(?:[.:|]|$)", re.IGNORECASE | re.MULTILINE)
+_MAX_CAPTION_LINES = 4  # Longer blocks may be a caption merged with body text, so they are kept
+_MARGIN_BAND = 0.07  # Top/bottom share of the page that holds running headers, footers and page numbers
+SECTIONS_CACHE_DIR = os.getenv("SECTIONS_CACHE_DIR", ".sections_cache")  # Capped by configurator.prune_cache_dir
+SECTIONS_NO_CACHE = os.getenv("SECTIONS_NO_CACHE") == "1"
+_SECTIONS_CACHE_VERSION = 1  # Bump when the parsing code changes so stale sectionings are not reused
+# Every tuning input of the parser goes into the cache key, so editing headers_map or a pattern invalidates old entries
+_SECTIONS_CACHE_SALT = hashlib.blake2b(repr((
+    _SECTIONS_CACHE_VERSION, sorted(hm.HEADER_MAP.items()), sorted(hm.POD_1), sorted(hm.SKIP_REVIEW_SECTIONS),
+    IGNORE_CAPTION_KEYWORDS, _MAX_HEADER_LINE, _MAX_CAPTION_LINES, _MARGIN_BAND,
+    [(r.pattern, r.flags) for r in (_HEADER_RE, _NUM_ONLY_RE, _LINE_NUMBER_RE, _CAPTION_RE)],
+)).encode("utf-8")).digest()
+
+
+@lru_cache(maxsize=4096)
 def _parse_header_components(text):
-    pattern = re.compile(r"^([IVXLCDMivxlcdm]+|\d+)(\.?)\s+([A-Z].*)$")
-    match = pattern.match(text)
+    if not text or not (text[0].isdecimal() or text[0] in _ROMAN_CHARS): return None, None
+    match = _HEADER_RE.match(text)
     if match: return match.group(1), match.group(3).strip()
     return None, None
 
 
 def _is_valid_numbered_header(num_str, phrase, expected_number):
+    # The number must continue the sequence; checking it first rejects most candidates before the phrase tests
+    current_val = int(num_str) if num_str.isdigit() else roman_to_int(num_str.upper())
+    if current_val != expected_number: return False
     if len(phrase) >= 30: return False
-    clean_phrase = phrase.upper().strip()
-    for keyword in IGNORE_CAPTION_KEYWORDS:
-        if clean_phrase.startswith(keyword): return False
-    current_val = 0
-    if num_str.isdigit():
-        current_val = int(num_str)
-    else:
-        val = roman_to_int(num_str)
-        if val is None: return False
-        current_val = val
-    return current_val == expected_number
+    return not phrase.upper().strip().startswith(IGNORE_CAPTION_KEYWORDS)
 
 
+@lru_cache(maxsize=4096)
 def _get_mapped_title(text):
-    clean_upper = text.upper().strip().replace(":", "")
-    if clean_upper in hm.HEADER_MAP: return hm.HEADER_MAP[clean_upper]
+    # The gate only rejects lines the lookup below cannot match: it sees the text as the lookup does, minus colons
+    core = text.strip().lstrip(":")
+    if not core or len(core) - core.count(":") > _MAX_MAPPED_LEN or core[0].upper()[:1] not in _MAPPED_FIRST_CHARS:
+        return None
+    return hm.HEADER_MAP.get(text.upper().strip().replace(":", ""))
+
+
+def _could_be_header(line):
+    # Numbered headers start with a digit or roman numeral, mapped ones with a HEADER_MAP initial once
+    # leading colons are dropped (as _get_mapped_title does)
+    if len(line) > _MAX_HEADER_LINE or line.isdecimal(): return False
+    first = line[0]
+    if first.isdecimal() or first in _ROMAN_CHARS: return True
+    mapped_first = line.lstrip(":")[:1]
+    return bool(mapped_first) and mapped_first.upper()[:1] in _MAPPED_FIRST_CHARS
+
+
+def _pdf_path(uploaded_file):
+    # Real files are opened and hashed by path; in-memory uploads (Streamlit's UploadedFile is a BytesIO)
+    # only carry a display name
+    path = getattr(uploaded_file, "name", None)
+    if not isinstance(uploaded_file, io.BytesIO) and isinstance(path, str) and os.path.isfile(path): return path
     return None
 
 
-def extract_sections_visual(uploaded_file):
+def _read_upload_bytes(uploaded_file):
+    getvalue = getattr(uploaded_file, "getvalue", None)
+    if getvalue: return getvalue()
     uploaded_file.seek(0)
-    file_bytes = uploaded_file.read()
-    doc = fitz.open(stream=file_bytes, filetype="pdf")
+    return uploaded_file.read()
+
+
+def extract_sections_visual(uploaded_file):
+    # Sectioning is deterministic per file, so re-runs over the same PDFs are served from disk
+    path = _pdf_path(uploaded_file)
+    data = None if path else _read_upload_bytes(uploaded_file)
+    if SECTIONS_NO_CACHE: return _parse_sections(path, data)
+    digest = hashlib.blake2b(_SECTIONS_CACHE_SALT, digest_size=16)
+    if path:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""): digest.update(chunk)
+    else:
+        digest.update(data)
+    cache_path = os.path.join(SECTIONS_CACHE_DIR, digest.hexdigest() + ".json")
+    try:
+        with open(cache_path, encoding="utf-8") as f: return json.load(f)
+    except (OSError, ValueError):  # Missing, pruned meanwhile, unreadable or corrupt: parse instead
+        pass
+
+    sections = _parse_sections(path, data)
+    try:
+        write_cache_file(cache_path, json.dumps(sections))
+        prune_cache_dir(SECTIONS_CACHE_DIR)
+    except OSError:  # The cache is best-effort: a valid PDF never fails over it
+        pass
+    return sections
+
+
+def _parse_sections(path, data):
     all_lines = []
-    for page in doc:
-        text = page.get_text("text")
-        lines = text.split('\n')
-        for line in lines:
-            clean = line.strip()
-            if clean: all_lines.append(clean)
-    doc.close()
+    with fitz.open(path) if path else fitz.open(stream=data, filetype="pdf") as doc:
+        for page in doc:
+            band = page.rect.height * _MARGIN_BAND
+            top, bottom = page.rect.y0 + band, page.rect.y1 - band
+            for x0, y0, x1, y1, text, block_no, block_type in page.get_text("blocks"):
+                # Keep text blocks only; drop ones lying wholly in a margin band, and figure/table captions
+                if block_type != 0 or y1 <= top or y0 >= bottom: continue
+                if _CAPTION_RE.match(text) and text.count("\n") <= _MAX_CAPTION_LINES: continue
+                all_lines.extend(filter(None, map(str.strip, text.splitlines())))
 
     sections = []
-    current_section = {"title": "PREAMBLE", "content": ""}
+    current_title, current_parts = "PREAMBLE", []
     expected_number = 1
     seen_mapped_titles = set()
     in_front_matter = True
 
-    i = 0
-    while i < len(all_lines):
+    # Only lines that could open a header get the full check; everything between them is body text
+    candidates = [i for i, line in enumerate(all_lines) if _could_be_header(line)]
+    pos = 0
+    for i in candidates:
+        if i < pos: continue  # Consumed as the title of a split numbered header
+        current_parts.extend(line for line in all_lines[pos:i] if not line.isdecimal())
         raw_line = all_lines[i]
-        if re.match(r'^\d+$', raw_line):  # Skip standalone line numbers
-            i += 1
-            continue
 
         candidate_lines = [raw_line]
-        strip_match = re.match(r'^\d+\s+(.*)$', raw_line)
+        strip_match = _LINE_NUMBER_RE.match(raw_line)
         if strip_match: candidate_lines.append(strip_match.group(1))
 
         detected_header = False
@@ -72,10 +145,10 @@ def extract_sections_visual(uploaded_file):
             if p_num and _is_valid_numbered_header(p_num, p_phrase, expected_number):
                 detected_header, is_numbered, num_str, phrase = True, True, p_num, p_phrase
             elif not detected_header and i + 1 < len(all_lines):
-                num_match = re.match(r"^([IVXLCDMivxlcdm]+|\d+)(\.?)$", line)
+                num_match = _NUM_ONLY_RE.match(line)
                 if num_match:
                     next_line = all_lines[i + 1].strip()
-                    nl_match = re.match(r'^\d+\s+(.*)$', next_line)
+                    nl_match = _LINE_NUMBER_RE.match(next_line)
                     if nl_match: next_line = nl_match.group(1)
                     if len(next_line) < 30 and next_line and next_line[0].isupper():
                         if _is_valid_numbered_header(num_match.group(1), next_line, expected_number):
@@ -91,22 +164,23 @@ def extract_sections_visual(uploaded_file):
             if in_front_matter:
                 if is_numbered or (core_title in hm.POD_1):
                     in_front_matter = False
-                elif core_title in ["METHOD", "EXPERIMENT", "RESULT", "DISCUSSION", "CONCLUSION"]:
+                elif core_title in {"METHOD", "EXPERIMENT", "RESULT", "DISCUSSION", "CONCLUSION"}:
                     detected_header = False
             if detected_header and core_title:
-                if core_title in seen_mapped_titles and core_title not in (hm.FRONT_MATTER + hm.BACK_MATTER):
+                if core_title in seen_mapped_titles and core_title not in hm.SKIP_REVIEW_SECTIONS:
                     detected_header = False
                 else:
                     seen_mapped_titles.add(core_title)
 
         if detected_header:
-            if current_section["content"].strip(): sections.append(current_section)
-            current_section = {"title": f"{num_str}. {phrase}" if is_numbered else phrase, "content": ""}
+            if current_parts: sections.append({"title": current_title, "content": " ".join(current_parts)})
+            current_title, current_parts = f"{num_str}. {phrase}" if is_numbered else phrase, []
             if is_numbered: expected_number += 1
             if skip_next_line: i += 1
         else:
-            current_section["content"] += raw_line + " "
-        i += 1
+            current_parts.append(raw_line)
+        pos = i + 1
 
-    if current_section["content"].strip(): sections.append(current_section)
+    current_parts.extend(line for line in all_lines[pos:] if not line.isdecimal())  # Standalone line numbers dropped
+    if current_parts: sections.append({"title": current_title, "content": " ".join(current_parts)})
     return sections
\ No newline at end of file
@@ -1,39 +1,107 @@
+import hashlib
+import json
+import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import prompts
+from configurator import clean_section_title, prune_cache_dir, write_cache_file
 from openai import OpenAI
 
+MODEL = "gpt-5"
+# gpt-5 spends part of max_completion_tokens on hidden reasoning, so the caps leave room beyond the visible answer
+FIRST_PASS_MAX_TOKENS = 4000
+BATCH_REVIEW_MAX_TOKENS = 16000
+MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "6"))
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".llm_cache")  # Size/age capped, see configurator.prune_cache_dir
+LLM_NO_CACHE = os.getenv("LLM_NO_CACHE") == "1"
 
+# Shared by every thread issuing requests, so fan-out across pods and papers stays under the rate limit
+_LLM_SEMAPHORE = threading.BoundedSemaphore(MAX_CONCURRENCY)
+_WS_RE = re.compile(r"\s+")
+_REVIEW_RE = re.compile(r'<REVIEW\s+section=["\']?(.*?)["\']?>(.*?)</REVIEW>', re.IGNORECASE | re.DOTALL)
+
+
+@lru_cache(maxsize=4)
 def get_openai_client(api_key):
-    return OpenAI(api_key=api_key)
+    # One client per key for the whole process, so Streamlit reruns and worker threads share its keep-alive pool
+    # The SDK retries 429/5xx itself with jittered exponential backoff, honouring Retry-After
+    return OpenAI(api_key=api_key, max_retries=MAX_RETRIES)
+
+
+def _chat(client, messages, max_tokens, is_complete=None, **kwargs):
+    # Identical requests (re-runs, duplicate uploads) are answered from disk instead of the API
+    request = json.dumps([MODEL, messages, max_tokens, kwargs], sort_keys=True)
+    key = hashlib.blake2b(request.encode("utf-8")).hexdigest()
+    cache_path = os.path.join(LLM_CACHE_DIR, key)
+    if not LLM_NO_CACHE:
+        try:
+            with open(cache_path, encoding="utf-8") as f: return f.read()
+        except OSError:  # Missing, pruned meanwhile, or unreadable: a miss
+            pass
+
+    with _LLM_SEMAPHORE:
+        response = client.chat.completions.create(model=MODEL, messages=messages, max_completion_tokens=max_tokens,
+                                                  **kwargs)
+        if response.choices[0].finish_reason == "length":
+            # Hidden reasoning can use up the cap before the answer is finished: retry once with twice the room
+            response = client.chat.completions.create(model=MODEL, messages=messages,
+                                                      max_completion_tokens=max_tokens * 2, **kwargs)
+    if response.choices[0].finish_reason == "length":
+        raise RuntimeError(f"{MODEL} reply was cut off at {max_tokens * 2} completion tokens")
+    content = response.choices[0].message.content or ""
+    # Only finished, well-formed replies are cached, so a bad one is retried on the next run instead of replayed
+    if content and response.choices[0].finish_reason == "stop" and not LLM_NO_CACHE:
+        if is_complete is None or is_complete(content):
+            try:
+                write_cache_file(cache_path, content)
+                prune_cache_dir(LLM_CACHE_DIR)
+            except OSError:  # The cache is best-effort: never lose a paid reply over it
+                pass
+    return content
 
 
 def evaluate_first_pass(client, paper_title, abstract_text, conference_name, audience):
-    prompt = prompts.get_first_pass_prompt(conference_name, paper_title, abstract_text, audience)
-    response = client.chat.completions.create(model="gpt-5", messages=[{"role": "user", "content": prompt}])
-    return response.choices[0].message.content
+    messages = prompts.get_first_pass_messages(conference_name, paper_title, abstract_text, audience)
+    return _chat(client, messages, FIRST_PASS_MAX_TOKENS, reasoning_effort="low")
 
 
 def generate_batch_review(client, sections_list, paper_title, conference_name, audience):
     if not sections_list: return {}
     sections_info = []
     for sec in sections_list:
-        clean_name = re.sub(r"^[\d\w]+\.\s*", "", sec['title'].upper().strip())
-        focus = prompts.get_section_focus(clean_name, audience)
-        sections_info.append({"title": sec['title'], "focus": focus, "content": sec['content']})
+        focus = prompts.get_section_focus(clean_section_title(sec['title']), audience)
+        # Collapse PDF layout whitespace: fewer tokens, and the 15000-char prompt budget holds more real text
+        content = _WS_RE.sub(" ", sec['content']).strip()
+        sections_info.append({"title": sec['title'], "focus": focus, "content": content})
+
+    messages = prompts.get_batch_review_messages(conference_name, paper_title, sections_info, audience)
+    raw_output = _chat(client, messages, BATCH_REVIEW_MAX_TOKENS,
+                       is_complete=lambda raw: None not in _match_reviews(raw, sections_list).values())
+    return {title: "AI failed to format feedback." if feedback is None else feedback
+            for title, feedback in _match_reviews(raw_output, sections_list).items()}
 
-    prompt = prompts.get_batch_review_prompt(conference_name, paper_title, sections_info, audience)
-    response = client.chat.completions.create(model="gpt-5", messages=[{"role": "user", "content": prompt}])
-    raw_output = response.choices[0].message.content
 
+def _match_reviews(raw_output, sections_list):
+    # Section title -> its <REVIEW> block text, or None when the reply has no block for it
     xml_results = {}
-    pattern = re.compile(r'<REVIEW\s+section=["\']?(.*?)["\']?>(.*?)</REVIEW>', re.IGNORECASE | re.DOTALL)
-    for match_title, feedback in pattern.findall(raw_output):
+    for match_title, feedback in _REVIEW_RE.findall(raw_output):
         xml_results[match_title.strip().upper()] = feedback.strip()
 
     final_results = {}
     for sec in sections_list:
         title_upper = sec['title'].strip().upper()
-        content = next((v for k, v in xml_results.items() if k in title_upper or title_upper in k),
-                       "AI failed to format feedback.")
-        final_results[sec['title']] = content
-    return final_results
\ No newline at end of file
+        final_results[sec['title']] = next((v for k, v in xml_results.items() if k in title_upper or title_upper in k),
+                                           None)
+    return final_results
+
+
+def review_pods(client, pods, paper_title, conference_name, audience):
+    # Pods are independent requests, so send them concurrently; results keep the order of `pods`.
+    if not pods: return []
+    with ThreadPoolExecutor(max_workers=len(pods)) as executor:
+        futures = [executor.submit(generate_batch_review, client, pod, paper_title, conference_name, audience)
+                   for pod in pods]
+        return [future.result() for future in futures]
@@ -69,13 +69,16 @@ HEADER_MAP = {
 # ==============================================================================
 
 # Front Matter is used strictly for the "First Pass" (Relevance Check)
-FRONT_MATTER = ["ABSTRACT", "PREAMBLE"]
+FRONT_MATTER = frozenset({"ABSTRACT", "PREAMBLE"})
 
 # Back Matter is completely ignored by the detailed AI reviewer
-BACK_MATTER = ["REFERENCES", "ACKNOWLEDGMENT", "APPENDIX", "DECLARATION"]
+BACK_MATTER = frozenset({"REFERENCES", "ACKNOWLEDGMENT", "APPENDIX", "DECLARATION"})
+
+# Front + Back Matter: filtered out before the detailed review pods are built
+SKIP_REVIEW_SECTIONS = FRONT_MATTER | BACK_MATTER
 
 # POD 1: The Setup (Sent to the AI together)
-POD_1 = ["INTRODUCTION", "RELATED WORK", "METHOD"]
+POD_1 = frozenset({"INTRODUCTION", "RELATED WORK", "METHOD"})
 
 # POD 2: The Execution & Findings (Sent to the AI together)
-POD_2 = ["EXPERIMENT", "RESULT", "DISCUSSION", "CONCLUSION"]
\ No newline at end of file
+POD_2 = frozenset({"EXPERIMENT", "RESULT", "DISCUSSION", "CONCLUSION"})
\ No newline at end of file
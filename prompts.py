@@ -1,29 +1,75 @@
-def get_track_criteria(conference_name):
-    criteria_map = {
-        "C1: AI & Computer Vision - Intelligence Beyond Boundaries":
-            "Look for: Novel neural network architectures, image/video processing, generative AI, object detection, or advanced machine learning methodologies.",
-        "C2: Quantum Frontiers - Computing, Security & Sensing":
-            "Look for: Quantum algorithms, qubit optimization, quantum cryptography (QKD), quantum error correction, or quantum sensors.",
-        "C3: Healthcare & Bio-Intelligence - Future of Medicine":
-            "Look for: Medical imaging analysis, bioinformatics, personalized medicine, clinical AI applications, or smart health wearables.",
-        "C4: Robotics & Autonomous Systems - Machines that Collaborate":
-            "Look for: Kinematics, path planning, human-robot interaction (HRI), autonomous vehicles, drones, or swarm robotics.",
-        "C5: Intelligent Manufacturing & Industry 5.0 - Human-Machine Synergy":
-            "Look for: Digital twins, industrial IoT (IIoT), predictive maintenance, supply chain optimization, or human-in-the-loop production systems.",
-        "C6: Embedded Systems & Edge Intelligence - Real-Time, Low-Power Innovation":
-            "Look for: Microcontrollers, FPGA designs, low-power machine learning (TinyML), real-time operating systems (RTOS), or edge computing.",
-        "C7: Convergence & Society - Ethics, Policy & Global Impact":
-            "Look for: AI ethics, regulatory frameworks, data privacy, algorithmic bias, or socio-economic impacts of emerging technologies."
-    }
-    return criteria_map.get(conference_name, "Ensure the technical content logically aligns with the stated track.")
-
-
-def get_first_pass_prompt(conference_name, paper_title, abstract_text, audience):
-
-    return f"""
-    You are a strict, objective reviewer assistant reporting to the committee for the conference: "{conference_name}".
-    Paper: "{paper_title}"
-    Abstract: "{abstract_text[:4000]}"
+TRACK_CRITERIA = {
+    "C1: AI & Computer Vision - Intelligence Beyond Boundaries":
+        "Look for: Novel neural network architectures, image/video processing, generative AI, object detection, or advanced machine learning methodologies.",
+    "C2: Quantum Frontiers - Computing, Security & Sensing":
+        "Look for: Quantum algorithms, qubit optimization, quantum cryptography (QKD), quantum error correction, or quantum sensors.",
+    "C3: Healthcare & Bio-Intelligence - Future of Medicine":
+        "Look for: Medical imaging analysis, bioinformatics, personalized medicine, clinical AI applications, or smart health wearables.",
+    "C4: Robotics & Autonomous Systems - Machines that Collaborate":
+        "Look for: Kinematics, path planning, human-robot interaction (HRI), autonomous vehicles, drones, or swarm robotics.",
+    "C5: Intelligent Manufacturing & Industry 5.0 - Human-Machine Synergy":
+        "Look for: Digital twins, industrial IoT (IIoT), predictive maintenance, supply chain optimization, or human-in-the-loop production systems.",
+    "C6: Embedded Systems & Edge Intelligence - Real-Time, Low-Power Innovation":
+        "Look for: Microcontrollers, FPGA designs, low-power machine learning (TinyML), real-time operating systems (RTOS), or edge computing.",
+    "C7: Convergence & Society - Ethics, Policy & Global Impact":
+        "Look for: AI ethics, regulatory frameworks, data privacy, algorithmic bias, or socio-economic impacts of emerging technologies."
+}
+DEFAULT_TRACK_CRITERIA = "Ensure the technical content logically aligns with the stated track."
+
+# ==============================================================================
+# SECTION FOCUS (keyword in section name -> focus bucket, checked in order)
+# ==============================================================================
+_FOCUS_KEYWORDS = (
+    ("METHOD", "method"),
+    ("EXPERIMENT", "result"), ("RESULT", "result"),
+    ("INTRO", "intro"),
+    ("RELATED", "related"), ("LITERATURE", "related"), ("BACKGROUND", "related"),
+    ("DISCUSSION", "discuss"), ("CONCLUSION", "discuss"),
+)
+
+_FOCUS_TITLES = {
+    "method": "Focus: Reproducibility and mathematical soundness.",
+    "result": "Focus: Fairness, statistical significance, and data claims.",
+    "intro": "Focus: Clarity of the research gap and problem statement.",
+    "related": "Focus: Coverage of recent works and differentiation.",
+    "discuss": "Focus: Validity of conclusions and limitations.",
+    "default": "Focus: General academic rigor and clarity.",
+}
+
+_FOCUS_POINTS = {
+    "reviewer": {
+        "header": "CRITICAL FLAWS TO CHECK FOR:",
+        "method": "- Complete lack of reproducibility details.\n- Severe mathematical unsoundness.\n- Highly unclear algorithm steps.",
+        "result": "- Unfair or completely missing baselines.\n- Total lack of statistical significance.\n- Highly exaggerated claims.",
+        "intro": "- Failing to identify any clear research gap.\n- Missing explicit contributions.",
+        "related": "- Missing recent state-of-the-art works (last 3 years).\n- Merely listing papers without any contrasting.",
+        "discuss": "- Making sweeping claims completely unsupported by data.\n- Entirely ignoring limitations.",
+        "default": "- Highly unclear logical flow.\n- Major claims without citation.",
+    },
+    "author": {
+        "header": "AREAS FOR CONSTRUCTIVE FEEDBACK (IF UNCLEAR):",
+        "method": "- Advise adding missing reproducibility details (parameters, dataset specs).\n- Point out highly undefined variables or equations.\n- Suggest clarifying algorithm steps if very unclear.",
+        "result": "- Suggest adding baselines if completely missing.\n- Recommend adding statistical significance if lacking.\n- Advise toning down exaggerated claims.",
+        "intro": "- Recommend clarifying the research gap if vague.\n- Suggest making contribution statements more explicit.",
+        "related": "- Advise including more recent state-of-the-art works if omitted.\n- Suggest explicitly contrasting existing works.",
+        "discuss": "- Advise narrowing claims if unsupported by experiments.\n- Suggest explicitly discussing limitations if ignored.",
+        "default": "- Suggest improvements if logical flow is very poor.\n- Point out major claims that need citations.",
+    },
+}
+
+# Full focus text per audience and bucket, built once at import
+SECTION_FOCUS = {
+    audience: {bucket: f"{title}\n{points['header']}\n{points[bucket]}" for bucket, title in _FOCUS_TITLES.items()}
+    for audience, points in _FOCUS_POINTS.items()
+}
+
+# ==============================================================================
+# PROMPT TEMPLATES
+# ==============================================================================
+# Static instructions go in the system message and paper-specific text in the user message, so every call
+# sharing an audience starts with an identical prefix that OpenAI's prompt caching can reuse
+FIRST_PASS_SYSTEM = """
+    You are a strict, objective reviewer assistant reporting to the committee of the conference named in the request.
 
     Task: Determine strictly if the paper is RELEVANT to the conference topic, AND generate a concise 3-word filename slug.
 
@@ -33,7 +79,7 @@ def get_first_pass_prompt(conference_name, paper_title, abstract_text, audience)
     3. **NO MARKDOWN:** Do not use bolding (**text**) or italics (*text*).
 
     Criteria for REJECT:
-    - Irrelevant: Topic is clearly outside the scope of {conference_name}.
+    - Irrelevant: Topic is clearly outside the scope of the conference.
 
     OUTPUT FORMAT:
     SLUG: [Write exactly 3 words summarizing the paper, separated by underscores. Example: Dexterous_Grasp_RL]
@@ -46,73 +92,38 @@ def get_first_pass_prompt(conference_name, paper_title, abstract_text, audience)
     DECISION: PROCEED
     """
 
+_FIRST_PASS_USER_TEMPLATE = """
+    Conference: "{conference_name}"
+    Paper: "{paper_title}"
+    Abstract: "{abstract_text}"
+    """
 
-def get_section_focus(clean_name, audience):
-    if audience == "reviewer":
-        header = "CRITICAL FLAWS TO CHECK FOR:"
-        method_focus = "- Complete lack of reproducibility details.\n- Severe mathematical unsoundness.\n- Highly unclear algorithm steps."
-        result_focus = "- Unfair or completely missing baselines.\n- Total lack of statistical significance.\n- Highly exaggerated claims."
-        intro_focus = "- Failing to identify any clear research gap.\n- Missing explicit contributions."
-        related_focus = "- Missing recent state-of-the-art works (last 3 years).\n- Merely listing papers without any contrasting."
-        discuss_focus = "- Making sweeping claims completely unsupported by data.\n- Entirely ignoring limitations."
-        default_focus = "- Highly unclear logical flow.\n- Major claims without citation."
-    else:
-        header = "AREAS FOR CONSTRUCTIVE FEEDBACK (IF UNCLEAR):"
-        method_focus = "- Advise adding missing reproducibility details (parameters, dataset specs).\n- Point out highly undefined variables or equations.\n- Suggest clarifying algorithm steps if very unclear."
-        result_focus = "- Suggest adding baselines if completely missing.\n- Recommend adding statistical significance if lacking.\n- Advise toning down exaggerated claims."
-        intro_focus = "- Recommend clarifying the research gap if vague.\n- Suggest making contribution statements more explicit."
-        related_focus = "- Advise including more recent state-of-the-art works if omitted.\n- Suggest explicitly contrasting existing works."
-        discuss_focus = "- Advise narrowing claims if unsupported by experiments.\n- Suggest explicitly discussing limitations if ignored."
-        default_focus = "- Suggest improvements if logical flow is very poor.\n- Point out major claims that need citations."
-
-    if "METHOD" in clean_name:
-        return f"Focus: Reproducibility and mathematical soundness.\n{header}\n{method_focus}"
-    elif "EXPERIMENT" in clean_name or "RESULT" in clean_name:
-        return f"Focus: Fairness, statistical significance, and data claims.\n{header}\n{result_focus}"
-    elif "INTRO" in clean_name:
-        return f"Focus: Clarity of the research gap and problem statement.\n{header}\n{intro_focus}"
-    elif "RELATED" in clean_name or "LITERATURE" in clean_name or "BACKGROUND" in clean_name:
-        return f"Focus: Coverage of recent works and differentiation.\n{header}\n{related_focus}"
-    elif "DISCUSSION" in clean_name or "CONCLUSION" in clean_name:
-        return f"Focus: Validity of conclusions and limitations.\n{header}\n{discuss_focus}"
-
-    return f"Focus: General academic rigor and clarity.\n{header}\n{default_focus}"
-
-
-def get_batch_review_prompt(conference_name, paper_title, sections_info, audience):
-    track_specifics = get_track_criteria(conference_name)
-
-    compiled_sections = ""
-    for sec in sections_info:
-        compiled_sections += f"\n\n====================\nSECTION TITLE: {sec['title']}\nSECTION FOCUS:\n{sec['focus']}\n\nTEXT:\n{sec['content'][:15000]}\n====================\n"
-
-    # UPDATED: Enforcing the 1-point pod minimum while retaining "do not nitpick" and max 3 per section
-    if audience == "reviewer":
-        persona = "strict, objective conference reviewer assistant."
-        status_options = "[ACCEPT / ACCEPT WITH SUGGESTIONS]"
-        issues_header = "FLAGGED ISSUES:"
-        approval_rule = "DO NOT NITPICK. However, you MUST flag a MINIMUM of 1 significant issue or area for improvement across the ENTIRE batch of sections provided below. Find the weakest aspect to help the committee. Do not exceed 3 bullet points for any single section."
-    else:
-        persona = "constructive, professional peer reviewer speaking directly to the paper's author."
-        status_options = "[MEETS DESK REQUIREMENTS / REVISIONS RECOMMENDED]"
-        issues_header = "SUGGESTED REVISIONS:"
-        approval_rule = "DO NOT NITPICK. However, you MUST provide a MINIMUM of 1 constructive suggestion for improvement across the ENTIRE batch of sections provided below. Find the weakest area to help the author refine their work. Address the author directly (e.g., 'Consider adding...'). Do not exceed 3 bullet points for any single section."
-
-    return f"""
+_SECTION_BLOCK_TEMPLATE = "\n\n====================\nSECTION TITLE: {title}\nSECTION FOCUS:\n{focus}\n\nTEXT:\n{content}\n====================\n"
+
+# Enforcing the 1-point pod minimum while retaining "do not nitpick" and max 3 per section
+_BATCH_REVIEW_ROLES = {
+    "reviewer": {
+        "persona": "strict, objective conference reviewer assistant.",
+        "status_options": "[ACCEPT / ACCEPT WITH SUGGESTIONS]",
+        "issues_header": "FLAGGED ISSUES:",
+        "approval_rule": "DO NOT NITPICK. However, you MUST flag a MINIMUM of 1 significant issue or area for improvement across the ENTIRE batch of sections provided below. Find the weakest aspect to help the committee. Do not exceed 3 bullet points for any single section.",
+    },
+    "author": {
+        "persona": "constructive, professional peer reviewer speaking directly to the paper's author.",
+        "status_options": "[MEETS DESK REQUIREMENTS / REVISIONS RECOMMENDED]",
+        "issues_header": "SUGGESTED REVISIONS:",
+        "approval_rule": "DO NOT NITPICK. However, you MUST provide a MINIMUM of 1 constructive suggestion for improvement across the ENTIRE batch of sections provided below. Find the weakest area to help the author refine their work. Address the author directly (e.g., 'Consider adding...'). Do not exceed 3 bullet points for any single section.",
+    },
+}
+
+_BATCH_REVIEW_SYSTEM_TEMPLATE = """
     SYSTEM ROLE:
     You are a {persona}
 
-    CONTEXT:
-    Conference Track: "{conference_name}"
-    Paper Title: "{paper_title}"
-
-    TRACK ALIGNMENT EXPECTATIONS:
-    {track_specifics}
-
     TASK:
-    You are being provided with a group of related sections from the paper below. Read ALL of them to understand the full context.
+    You are being provided with a group of related sections from a paper. Read ALL of them to understand the full context.
 
-    After reading, generate a SEPARATE review for EACH section. 
+    After reading, generate a SEPARATE review for EACH section.
     Cross-reference each section strictly against its listed "SECTION FOCUS", AND ensure the technical details align with the "TRACK ALIGNMENT EXPECTATIONS".
 
     CRITICAL APPROVAL RULE: {approval_rule}
@@ -134,7 +145,46 @@ def get_batch_review_prompt(conference_name, paper_title, sections_info, audienc
     </REVIEW>
 
     (Note: If the STATUS is ACCEPT or MEETS DESK REQUIREMENTS, omit the {issues_header} entirely. Do not write "None".)
+    """
+
+# Built once per audience at import
+BATCH_REVIEW_SYSTEM = {audience: _BATCH_REVIEW_SYSTEM_TEMPLATE.format(**role)
+                       for audience, role in _BATCH_REVIEW_ROLES.items()}
+
+_BATCH_REVIEW_USER_TEMPLATE = """
+    CONTEXT:
+    Conference Track: "{conference_name}"
+    Paper Title: "{paper_title}"
+
+    TRACK ALIGNMENT EXPECTATIONS:
+    {track_specifics}
 
     HERE ARE THE SECTIONS TO REVIEW:
     {compiled_sections}
-    """
\ No newline at end of file
+    """
+
+def get_track_criteria(conference_name):
+    return TRACK_CRITERIA.get(conference_name, DEFAULT_TRACK_CRITERIA)
+
+
+def get_first_pass_messages(conference_name, paper_title, abstract_text, audience):
+    user = _FIRST_PASS_USER_TEMPLATE.format(conference_name=conference_name, paper_title=paper_title,
+                                            abstract_text=abstract_text[:4000])
+    return [{"role": "system", "content": FIRST_PASS_SYSTEM}, {"role": "user", "content": user}]
+
+
+def get_section_focus(clean_name, audience):
+    focus = SECTION_FOCUS["reviewer" if audience == "reviewer" else "author"]
+    bucket = next((b for keyword, b in _FOCUS_KEYWORDS if keyword in clean_name), "default")
+    return focus[bucket]
+
+
+def get_batch_review_messages(conference_name, paper_title, sections_info, audience):
+    compiled_sections = "".join(
+        _SECTION_BLOCK_TEMPLATE.format(title=sec['title'], focus=sec['focus'], content=sec['content'][:15000])
+        for sec in sections_info)
+    user = _BATCH_REVIEW_USER_TEMPLATE.format(conference_name=conference_name, paper_title=paper_title,
+                                              track_specifics=get_track_criteria(conference_name),
+                                              compiled_sections=compiled_sections)
+    system = BATCH_REVIEW_SYSTEM["reviewer" if audience == "reviewer" else "author"]
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
@@ -1,43 +1,50 @@
 import csv
 import io
+import os
 import zipfile
 from fpdf import FPDF
 from configurator import sanitize_text_for_pdf
 from disclaimer import DISCLAIMERS
 
+# Unicode TTF bundled with the repo
+FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dejavu-sans-ttf-2.37", "ttf", "DejaVuSans.ttf")
+
 
 def create_pdf_report(full_report_text, filename, audience):
     pdf = FPDF()
+    pdf.add_font("DejaVu", '', FONT_PATH)
     pdf.add_page()
-    pdf.set_font("Arial", 'B', 16)
+    pdf.set_font("Helvetica", 'B', 16)
     title = "AI Desk Review" if audience == "reviewer" else "AI Author Feedback"
-    pdf.cell(0, 10, txt=title, ln=True, align='C')
-    pdf.set_font("Arial", '', 8)
+    pdf.cell(0, 10, text=title, new_x="LMARGIN", new_y="NEXT", align='C')
+    pdf.set_font("DejaVu", '', 8)
     pdf.set_text_color(100, 100, 100)
-    pdf.multi_cell(0, 4, txt=DISCLAIMERS[audience])
+    pdf.multi_cell(0, 4, text=DISCLAIMERS[audience], new_x="LMARGIN", new_y="NEXT")
     pdf.ln(5)
-    pdf.set_font("Arial", '', 12)
+    pdf.set_font("DejaVu", '', 12)
     pdf.set_text_color(0, 0, 0)
 
     clean_text = sanitize_text_for_pdf(full_report_text)
+    body_lines = []  # Consecutive plain lines go out in one multi_cell
     for line in clean_text.split('\n'):
-        line = line.encode('latin-1', 'replace').decode('latin-1')
         if "SECTION:" in line:
+            if body_lines: pdf.multi_cell(0, 5, "\n".join(body_lines), new_x="LMARGIN", new_y="NEXT")
+            body_lines = []
             pdf.ln(3)
-            pdf.set_font("Arial", 'B', 12)
-            pdf.cell(0, 10, txt=line, ln=True)
-            pdf.set_font("Arial", '', 12)
+            pdf.set_font("Helvetica", 'B', 12)  # Only a regular DejaVu face is bundled; headings stay in core bold
+            pdf.cell(0, 10, text=line.encode('latin-1', 'replace').decode('latin-1'), new_x="LMARGIN", new_y="NEXT")
+            pdf.set_font("DejaVu", '', 12)
         else:
-            pdf.multi_cell(0, 5, line)
-    return pdf.output(dest="S").encode("latin-1", "replace")
+            body_lines.append(line)
+    if body_lines: pdf.multi_cell(0, 5, "\n".join(body_lines), new_x="LMARGIN", new_y="NEXT")
+    return bytes(pdf.output())
 
 
 def create_batch_csv(results_list):
     output = io.StringIO()
     writer = csv.writer(output)
     writer.writerow(["Filename", "Decision", "Comments"])
-    for p in results_list:
-        writer.writerow([p['filename'], p['decision'], p['notes']])
+    writer.writerows((p['filename'], p['decision'], p['notes']) for p in results_list)
     return output.getvalue()
 
 